@@ -21,58 +21,808 @@ Usage examples:
 """
 
 import argparse
+import ast
+import bisect
+import functools
+import hashlib
 import importlib
 import importlib.metadata
 import importlib.util
+import io
 import json
 import logging
+import mmap
+import multiprocessing
 import os
+import pickle
+import re
+import shutil
 import subprocess
 import sys
+import tarfile
+import tempfile
 import threading
 import time
 import zipfile
-from collections import defaultdict
+import zlib
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, repeat
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+# Leading distribution name of a requirement string (PEP 508 name characters)
+_NAME_RE = re.compile(r"\s*([A-Za-z0-9_][A-Za-z0-9_.\-]*)")
 
 # Optional: robust parsing for "Requires-Dist" lines
 try:
     from packaging.requirements import Requirement  # type: ignore
 except Exception:  # lightweight fallback if "packaging" isn't installed
 
-    class Requirement:  # minimal parser: name[; or ( or space] ...
+    class Requirement:  # minimal parser: leading name only
         def __init__(self, req: str):
-            req = req.strip()
-            cut = len(req)
-            for sep in [";", "(", " "]:
-                if sep in req:
-                    cut = min(cut, req.index(sep))
-            self.name = req[:cut].strip()
+            m = _NAME_RE.match(req)
+            self.name = m.group(1) if m else ""
             self.extras = set()
             self.marker = None
 
 
+# Optional: SIMD-accelerated deflate and CRC32 with the same API as zlib.
+# python-zlib-ng keeps zlib's 0-9 levels; python-isal only has levels 0-3.
+try:
+    from zlib_ng import zlib_ng as fast_zlib  # type: ignore
+
+    FAST_ZLIB_MAX_LEVEL = 9
+except ImportError:
+    try:
+        from isal import isal_zlib as fast_zlib  # type: ignore
+
+        FAST_ZLIB_MAX_LEVEL = 3
+    except ImportError:
+        fast_zlib = None
+        FAST_ZLIB_MAX_LEVEL = 9
+
+# Optional: multi-threaded zstd for --compression zstd (.tar.zst packages)
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Packages with fewer .py files than this are parsed inline; spinning up worker
+# processes costs more than it saves on small trees.
+PARALLEL_PARSE_THRESHOLD = 64
+
+# Subtrees whose imports are not followed by default (--deep-scan follows them,
+# along with imports inside function and class bodies, which are otherwise
+# skipped): test suites pull in test runners, vendored copies import their own
+# siblings
+SCAN_SKIP_DIRS = frozenset({"tests", "test", "vendor", "_vendor", "examples"})
+
+# Directories skipped when packaging with prune=True (--prune)
+PRUNE_DIRS = frozenset({"tests", "test"})
+
+# zstd level for .tar.zst packages (zstd's own default; 1-22, higher is smaller)
+ZSTD_LEVEL = 3
+
+# boto3 uploads: files above one chunk go multipart, chunks PUT in parallel
+S3_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+S3_MAX_CONCURRENCY = 10
+
+# Compiled bytecode is never packaged (the runtime recompiles what it needs)
+SKIP_SUFFIXES = (".pyc", ".pyo")
+# Native libraries, the only files whose size is checked before packaging
+BINARY_SUFFIXES = (".so", ".dll", ".dylib")
+
+# Already-compressed formats: deflating them again costs CPU for ~0% gain, so
+# they go into the ZIP stored. (Native .so/.dll still deflate well and are not listed.)
+STORED_SUFFIXES = (
+    ".whl",
+    ".zip",
+    ".egg",
+    ".jar",
+    ".gz",
+    ".tgz",
+    ".bz2",
+    ".xz",
+    ".zst",
+    ".7z",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".woff",
+    ".woff2",
+)
 
-def slow_print(text: str, delay: float = 0.03):
-    """Print text character by character with a delay."""
-    for char in text:
-        print(char, end="", flush=True)
-        time.sleep(delay)
+# Files above this size are streamed into the ZIP by the writer thread in
+# STREAM_CHUNK_SIZE pieces instead of being read whole and deflated in a worker.
+# Stored (already-compressed) files gain nothing from a worker, so any larger
+# than one chunk are streamed too.
+STREAM_THRESHOLD = 16 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Cap on source bytes read ahead by deflate workers and not yet written out
+WRITE_WINDOW_BYTES = 64 * 1024 * 1024
+# sendfile() into a regular file only works on Linux (macOS and the BSDs need a
+# socket as the destination); same gate as shutil's _USE_CP_SENDFILE
+USE_SENDFILE = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
+# Sources at least this large are memory-mapped rather than read into a bytes copy
+MMAP_THRESHOLD = 64 * 1024
+
+# Box-drawing pieces for _render_tree: the connector in front of a node, and the
+# prefix segment its subtree is indented by
+TREE_BRANCH = "├── "
+TREE_LAST = "└── "
+TREE_PIPE = "│   "
+TREE_SPACE = "    "
+
+# Characters written per stdout write/flush by slow_print (--slow-print)
+SLOW_PRINT_CHUNK = 8
+
+# Rendered trees kept per process, keyed by graph contents and roots
+RENDER_CACHE_SIZE = 32
+
+# Python's own stdlib listing (3.10+); empty on older interpreters
+_STDLIB_NAMES = frozenset(getattr(sys, "stdlib_module_names", ()))
+
+# An import statement reduced to plain data: (module, level, names).
+#   import a.b, c        -> (None, 0, ("a.b", "c"))
+#   from x.y import z    -> ("x.y", 0, ("z",))
+#   from . import z      -> (None, 1, ("z",))
+ImportRecord = Tuple[Optional[str], int, Tuple[str, ...]]
+
+# Extracted imports are cached across runs, keyed by path and validated against
+# the file's (st_mtime_ns, st_size); site-packages sources rarely change.
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "module_packager"
+# One cache file per site-packages directory: imports-<sha1 of its path>.pickle
+IMPORT_CACHE_FILE = "imports-{key}.pickle"
+# --deep-scan records imports from every scope, so it keeps a separate cache
+DEEP_IMPORT_CACHE_FILE = "imports-deep-{key}.pickle"
+# Bump whenever _extract_imports changes what it reports so stale entries are dropped.
+IMPORT_CACHE_VERSION = 4
+ImportCacheEntry = Tuple[int, int, List[ImportRecord]]  # (mtime_ns, size, records)
+# Whole import-crawl results per root module: dep-graph-<same key>.json, valid
+# only while the site-packages fingerprint stored inside it still matches and
+# every file and directory the crawl read is unchanged.
+DEP_GRAPH_CACHE_FILE = "dep-graph-{key}.json"
+# (external top-level deps, import edges parent -> children) for one crawl
+DepGraphEntry = Tuple[FrozenSet[str], Dict[str, FrozenSet[str]]]
+# What a crawl read, relative to site-packages: source files -> (mtime_ns, size)
+# and walked directories -> mtime_ns (catches files added or removed)
+CrawlStamps = Tuple[Dict[str, Tuple[int, int]], Dict[str, int]]
+# Resolved Requires-Dist graphs per (root, include_extras), valid while the
+# installed metadata of the running interpreter is unchanged
+METADATA_GRAPH_CACHE_FILE = "metadata-graph-{key}.json"
+
+# Cheap byte-level test run before ast.parse: a statement can only be an import if
+# "import"/"from" starts a line or follows ";" or ":" (e.g. "try: import x").
+_IMPORT_RE = re.compile(rb"(?:^|[;:])[ \t]*(?:from|import)\b", re.MULTILINE)
+
+# Fast path for files whose imports are all plain column-0 statements, which are
+# module-level by construction: "import a.b as c, d", "from .x import (y, z)".
+# Comments inside (...) are consumed through their newline so a ")" in one
+# cannot end the group early.
+_FAST_IMPORT_RE = re.compile(
+    rb"(?:import[ \t]+([^\n#;\\(]+)"
+    rb"|from[ \t]+(\.*)[ \t]*([\w.]*)[ \t]+import[ \t]*"
+    rb"(?:\(((?:[^)#]|#[^\n]*\n)*)\)|([^\n#;\\(]+)))"
+    rb"[ \t]*(?:#[^\n]*)?$",
+    re.MULTILINE,
+)
+# An optional module docstring opening the file (after comments/blank lines)
+_DOCSTRING_RE = re.compile(
+    rb"\A(?:\xef\xbb\xbf)?(?:[ \t]*(?:#[^\n]*)?\r?\n)*[ \t]*[rRuU]?(\"\"\"|\'\'\')"
+)
+_COMMENT_RE = re.compile(rb"#[^\n]*")
+_NAME_TOKEN_RE = re.compile(r"[A-Za-z_][\w.]*\Z", re.ASCII)
+
+
+def slow_print(text: str, delay: float = 0.03, chunk: int = SLOW_PRINT_CHUNK):
+    """Print text progressively, with a delay per character.
+
+    Writes chunk characters at a time and sleeps delay per character written,
+    so the pacing matches a per-character loop at 1/chunk of the writes.
+    """
+    write, flush = sys.stdout.write, sys.stdout.flush
+    for i in range(0, len(text), chunk):
+        piece = text[i : i + chunk]
+        write(piece)
+        flush()
+        time.sleep(delay * len(piece))
     print()  # Add newline at the end
 
 
+@functools.lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_graph(
+    graph: FrozenSet[Tuple[str, FrozenSet[str]]],
+    roots: Tuple[str, ...],
+    expand_shared: bool,
+) -> str:
+    """ModulePackager._render_tree on a frozen graph and sorted roots, memoised."""
+    buf = io.StringIO()
+    write = buf.write
+    visited_in_path: Set[str] = set()  # Track current path to detect cycles
+    global_visited: Set[str] = set()  # Track all visited to avoid duplicates
+    # Sort each node's children once rather than on every visit
+    sorted_children = {node: sorted(kids) for node, kids in graph}
+    # expand_shared: node -> its subtree's lines without the leading prefix,
+    # and for nodes on the path, (buffer offset, circular count, prefix length)
+    # at the time their children started
+    subtree_cache: Dict[str, List[str]] = {}
+    expanding: Dict[str, Tuple[int, int, int]] = {}
+    circular_count = 0
+
+    # Process each root
+    for i, root in enumerate(roots):
+        if root in global_visited and not expand_shared:
+            # Expanded under an earlier root: the walk would print just the name
+            write(f"{root}\n")
+        else:
+            visited_in_path.clear()
+            # Explicit-stack DFS, so deep graphs cannot hit the recursion limit.
+            # Entries are (node, prefix, is_last, depth); depth -1 marks the point
+            # where a node's subtree is done and it leaves the current path.
+            stack: List[Tuple[str, str, bool, int]] = [(root, "", True, 0)]
+            while stack:
+                node, prefix, is_last, depth = stack.pop()
+                if depth < 0:
+                    # Remove from current path when backtracking
+                    visited_in_path.discard(node)
+                    if expand_shared:
+                        start, circulars, prefix_len = expanding.pop(node)
+                        if circulars == circular_count:
+                            buf.seek(start)
+                            subtree_cache[node] = [
+                                line[prefix_len:]
+                                for line in buf.read().splitlines(keepends=True)
+                            ]
+                    continue
+
+                # Detect circular dependencies
+                if node in visited_in_path:
+                    connector = TREE_LAST if is_last else TREE_BRANCH
+                    write(f"{prefix}{connector}{node} ↻ (circular)\n")
+                    circular_count += 1
+                    continue
+
+                # Seen before (but not in current path) and not expanded again
+                already_shown = node in global_visited and not expand_shared
+
+                # Choose the right connector and display the node
+                if depth == 0:
+                    # Root node
+                    write(f"{node}\n")
+                else:
+                    connector = TREE_LAST if is_last else TREE_BRANCH
+                    marker = " (already shown)" if already_shown else ""
+                    write(f"{prefix}{connector}{node}{marker}\n")
+
+                # Only show children if we haven't fully processed this node before
+                if already_shown:
+                    continue
+
+                # Build the prefix for the children
+                if depth == 0:
+                    child_prefix = ""
+                else:
+                    child_prefix = prefix + (TREE_SPACE if is_last else TREE_PIPE)
+
+                cached = subtree_cache.get(node)
+                if cached is not None:
+                    for line in cached:
+                        write(child_prefix + line)
+                    continue
+
+                # Add current node to path, and mark it as globally visited
+                # before processing children
+                visited_in_path.add(node)
+                global_visited.add(node)
+                stack.append((node, "", False, -1))
+                if expand_shared:
+                    expanding[node] = (buf.tell(), circular_count, len(child_prefix))
+
+                # Push in reverse so the first child is rendered first
+                children = sorted_children.get(node, [])
+                last = len(children) - 1
+                for j in range(last, -1, -1):
+                    stack.append((children[j], child_prefix, j == last, depth + 1))
+
+        # Add spacing between different root trees
+        if i < len(roots) - 1:
+            write("\n")
+
+    return buf.getvalue()
+
+
+def _walk_files(
+    root: str, skip_dirs: FrozenSet[str] = frozenset()
+) -> Iterable[os.DirEntry]:
+    """Yield a DirEntry for every file below root.
+
+    Iterative os.scandir walk: file types come from the directory listing, so no
+    per-entry stat() and no Path objects. Like Path.rglob, symlinked directories
+    are not descended into. __pycache__ and any directory named in skip_dirs are
+    pruned without being listed.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__" and entry.name not in skip_dirs:
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry
+
+
+def _list_tree(
+    root: str, dir_paths: Optional[List[Tuple[str, FrozenSet[str]]]] = None
+) -> List[Tuple[os.DirEntry, FrozenSet[str]]]:
+    """List every file below root with the names of the directories between them.
+
+    Same traversal and order as _walk_files without skip_dirs; the directory
+    names let callers apply different skip sets to one listing afterwards.
+    Directories read (root included) are appended to dir_paths when given.
+    """
+    files = []
+    stack = [(root, frozenset())]
+    while stack:
+        path, dirs = stack.pop()
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            continue
+        if dir_paths is not None:
+            dir_paths.append((path, dirs))
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__":
+                        stack.append((entry.path, dirs | {entry.name}))
+                elif entry.is_file():
+                    files.append((entry, dirs))
+    return files
+
+
+def _matching_parent(
+    module_name: str, names: FrozenSet[str], dotted: bool
+) -> Optional[str]:
+    """First of module_name's prefixes ("a", "a.b", ...) that is in names, if any.
+
+    Only the top-level segment can match unless names has dotted entries.
+    """
+    base = module_name.split(".", 1)[0]
+    if base in names:
+        return base
+    if dotted:
+        module_parts = module_name.split(".")
+        for i in range(2, len(module_parts) + 1):
+            parent_module = ".".join(module_parts[:i])
+            if parent_module in names:
+                return parent_module
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_req(req_str: str) -> Tuple[Optional[str], FrozenSet[str], bool]:
+    """Parse a Requires-Dist entry into (name, extras, applies), memoised per process.
+
+    ``applies`` is the entry's environment marker evaluated for this interpreter;
+    it is True without a marker or when the marker cannot be evaluated.
+    """
+    try:
+        r = Requirement(req_str)
+    except Exception:
+        # very naive fallback: take the leading name token
+        m = _NAME_RE.match(req_str)
+        return (m.group(1) if m else ""), frozenset(), True
+    marker = getattr(r, "marker", None)
+    applies = True
+    try:
+        if marker and hasattr(marker, "evaluate") and not marker.evaluate():
+            applies = False
+    except Exception:
+        pass  # if packaging not present, ignore marker
+    return getattr(r, "name", None), frozenset(getattr(r, "extras", ())), applies
+
+
+@functools.lru_cache(maxsize=None)
+def _find_spec_cached(module_name: str):
+    """importlib.util.find_spec, memoised per process (lookups that raise are not cached)."""
+    return importlib.util.find_spec(module_name)
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    """True for the guard of an ``if TYPE_CHECKING:`` / ``if typing.TYPE_CHECKING:`` block."""
+    if type(test) is ast.Name:
+        return test.id == "TYPE_CHECKING"
+    return type(test) is ast.Attribute and test.attr == "TYPE_CHECKING"
+
+
+def _if_blocks(node: ast.If) -> List[List[ast.stmt]]:
+    """Body and else branch; ``if TYPE_CHECKING:`` bodies never run, so only else."""
+    if _is_type_checking(node.test):
+        return [node.orelse]
+    return [node.body, node.orelse]
+
+
+def _try_blocks(node: ast.Try) -> List[List[ast.stmt]]:
+    """Body, else branch, each except handler, then finally."""
+    blocks = [node.body, node.orelse]
+    blocks.extend(handler.body for handler in node.handlers)
+    blocks.append(node.finalbody)
+    return blocks
+
+
+def _with_blocks(node: ast.With) -> List[List[ast.stmt]]:
+    """The with body."""
+    return [node.body]
+
+
+# Dispatch table for compound statements whose bodies are still module-level
+# code: node type -> statement lists to descend into, in visiting order.
+# Imports nested in function and class bodies are not followed (see deep in
+# _extract_imports_from).
+_IMPORT_CONTAINERS: Dict[type, Callable[[ast.stmt], List[List[ast.stmt]]]] = {
+    getattr(ast, name): blocks
+    for name, blocks in (
+        ("If", _if_blocks),
+        ("Try", _try_blocks),
+        ("TryStar", _try_blocks),
+        ("With", _with_blocks),
+        ("AsyncWith", _with_blocks),
+    )
+    if hasattr(ast, name)
+}
+
+
+def _iter_imports(body: List[ast.stmt]) -> Iterable[ast.stmt]:
+    """Yield module-level Import/ImportFrom statements, including those guarded by
+    if/try/with blocks, without visiting expression nodes.
+
+    Depth-first over an explicit stack of statement iterators, in source order;
+    which blocks of a compound statement are entered comes from _IMPORT_CONTAINERS.
+    """
+    Import, ImportFrom = ast.Import, ast.ImportFrom
+    containers = _IMPORT_CONTAINERS
+    stack = [iter(body)]
+    while stack:
+        for node in stack[-1]:
+            node_type = type(node)
+            if node_type is Import or node_type is ImportFrom:
+                yield node
+                continue
+            blocks = containers.get(node_type)
+            if blocks is not None:
+                # Descend now; this level resumes after the container is done
+                stack.append(chain.from_iterable(blocks(node)))
+                break
+        else:
+            stack.pop()
+
+
+def _split_import_names(raw: bytes, parenthesized: bool) -> Optional[Tuple[str, ...]]:
+    """Split "a as b, c.d" into ("a", "c.d"); None if anything looks unusual."""
+    if parenthesized:
+        raw = _COMMENT_RE.sub(b"", raw)
+    names = []
+    for part in raw.split(b","):
+        tokens = part.split()
+        if not tokens:
+            if parenthesized:
+                continue  # trailing comma / blank line inside (...)
+            return None
+        if len(tokens) not in (1, 3) or (len(tokens) == 3 and tokens[1] != b"as"):
+            return None
+        try:
+            name = tokens[0].decode("ascii")
+        except UnicodeDecodeError:
+            return None  # non-ASCII identifiers need the parser's NFKC handling
+        if name != "*" and not _NAME_TOKEN_RE.match(name):
+            return None
+        names.append(name)
+    return tuple(names) if names else None
+
+
+def _scan_imports_fast(data: bytes) -> Optional[List[ImportRecord]]:
+    """Read imports without building an AST when the file makes that unambiguous.
+
+    Returns None (caller falls back to ast.parse) unless every import-like line
+    starts at column 0, is a single complete statement, and cannot sit inside a
+    triple-quoted string (only a leading module docstring may precede it).
+    """
+    starts = []
+    for m in _IMPORT_RE.finditer(data):
+        if m.group()[:1] not in (b"f", b"i"):
+            return None  # indented, or after ";" / ":"
+        starts.append(m.start())
+
+    doc = _DOCSTRING_RE.match(data)
+    if doc:
+        close = data.find(doc.group(1), doc.end())
+        if close < 0 or close > starts[0]:
+            return None
+        between = data[close + 3 : starts[-1]]
+    else:
+        between = data[: starts[-1]]
+    if b'"""' in between or b"'''" in between:
+        return None
+
+    records: List[ImportRecord] = []
+    for start in starts:
+        m = _FAST_IMPORT_RE.match(data, start)
+        if not m:
+            return None
+        if m.group(1) is not None:
+            names = _split_import_names(m.group(1), False)
+            if names is None:
+                return None
+            records.append((None, 0, names))
+            continue
+        dots, module = m.group(2), m.group(3)
+        if not dots and not module:
+            return None
+        if module and not _NAME_TOKEN_RE.match(module.decode("ascii", "replace")):
+            return None
+        parenthesized = m.group(4) is not None
+        names = _split_import_names(m.group(4 if parenthesized else 5), parenthesized)
+        if names is None:
+            return None
+        records.append((module.decode("ascii") if module else None, len(dots), names))
+    return records
+
+
+def _extract_imports(file_path: str, deep: bool = False) -> List[ImportRecord]:
+    """Parse a Python file and return its module-level imports as ImportRecords
+    (imports from every scope with deep).
+
+    Kept free of ModulePackager state so it can run in a worker process. Large
+    files are memory-mapped so the pre-filter and scanner read the page cache
+    directly instead of copying the whole file first.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return _extract_imports_from(f.read(), file_path, deep)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _extract_imports_from(data, file_path, deep)
+
+
+def _extract_imports_from(
+    data: bytes, file_path: str, deep: bool = False
+) -> List[ImportRecord]:
+    """Extract ImportRecords from a file's raw bytes (or a read-only mmap of them).
+
+    By default only module-level imports count (see _iter_imports); deep also
+    takes imports from function and class bodies and TYPE_CHECKING blocks, the
+    lazy imports that only run when that code does.
+    """
+    if not _IMPORT_RE.search(data):
+        return []
+    # The fast scanner only accepts files whose imports are all at column 0,
+    # so its result is complete in either mode
+    fast_records = _scan_imports_fast(data)
+    if fast_records is not None:
+        return fast_records
+    # compile() directly, like ast.parse, but without inheriting this module's
+    # __future__ flags; on bytes it honours PEP 263 coding cookies, skipping a decode
+    try:
+        tree = compile(data, file_path, "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+    except (SyntaxError, ValueError):
+        text = bytes(data).decode("utf-8", errors="ignore")
+        tree = compile(text, file_path, "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+    records: List[ImportRecord] = []
+    append = records.append
+    Import, ImportFrom = ast.Import, ast.ImportFrom
+    if deep:
+        nodes = (
+            node
+            for node in ast.walk(tree)
+            if type(node) is Import or type(node) is ImportFrom
+        )
+    else:
+        nodes = _iter_imports(tree.body)
+    for node in nodes:
+        names = tuple(alias.name for alias in node.names)
+        if type(node) is Import:
+            append((None, 0, names))
+        else:
+            append((node.module, node.level, names))
+    return records
+
+
+def _extract_imports_worker(
+    file_path: str, deep: bool = False
+) -> Tuple[str, List[ImportRecord], Optional[str]]:
+    """Process-pool entry point: never raises, reports the error message instead."""
+    try:
+        return file_path, _extract_imports(file_path, deep), None
+    except Exception as e:
+        return file_path, [], str(e)
+
+
+def _is_streamed(archive_path: str, file_size: int) -> bool:
+    """Whether the writer streams this entry instead of a worker buffering it."""
+    if archive_path.lower().endswith(STORED_SUFFIXES):
+        return file_size > STREAM_CHUNK_SIZE
+    return file_size > STREAM_THRESHOLD
+
+
+def _deflate_file(
+    file_path: str, archive_path: str, compresslevel: int
+) -> Tuple[zipfile.ZipInfo, Optional[bytes]]:
+    """Read and deflate one file off the main thread (zlib releases the GIL).
+
+    Files that are already compressed are stored as-is. Streamed files (see
+    _is_streamed) are not read; the payload is None and the writer copies them.
+    """
+    zinfo = zipfile.ZipInfo.from_file(file_path, archive_path)
+    if archive_path.lower().endswith(STORED_SUFFIXES):
+        zinfo.compress_type = zipfile.ZIP_STORED
+    else:
+        zinfo.compress_type = zipfile.ZIP_DEFLATED
+    if _is_streamed(archive_path, zinfo.file_size):
+        return zinfo, None
+    with open(file_path, "rb") as f:
+        if (
+            zinfo.compress_type == zipfile.ZIP_STORED
+            or os.fstat(f.fileno()).st_size < MMAP_THRESHOLD
+        ):
+            return _deflate_data(zinfo, f.read(), compresslevel)
+        # Deflate straight from the page cache instead of copying the file first
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _deflate_data(zinfo, data, compresslevel)
+
+
+def _deflate_data(
+    zinfo: zipfile.ZipInfo, data: bytes, compresslevel: int
+) -> Tuple[zipfile.ZipInfo, bytes]:
+    """Fill in zinfo's CRC and sizes for data and return it with the entry payload."""
+    if zinfo.compress_type == zipfile.ZIP_STORED:
+        payload = data
+    else:
+        if fast_zlib is not None and compresslevel > 0:
+            level = min(compresslevel, FAST_ZLIB_MAX_LEVEL)
+            compressor = fast_zlib.compressobj(level, fast_zlib.DEFLATED, -15)
+        else:
+            compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+    zinfo.file_size = len(data)
+    zinfo.CRC = (fast_zlib or zlib).crc32(data)
+    zinfo.compress_size = len(payload)
+    return zinfo, payload
+
+
+def _write_deflated(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, payload: bytes):
+    """Append an already-deflated entry, mirroring what ZipFile.write() does.
+
+    CRC and sizes are known up front, so the local header is written once and no
+    data descriptor or seek-back is needed.
+    """
+    with zipf._lock:
+        _write_local_header(zipf, zinfo)
+        zipf.fp.write(payload)
+        _finish_entry(zipf, zinfo)
+
+
+def _write_local_header(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo):
+    """Start an entry whose CRC and sizes are already set (caller holds _lock)."""
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+    zipf.fp.seek(zipf.start_dir)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf._writecheck(zinfo)
+    zipf._didModify = True
+    zipf.fp.write(zinfo.FileHeader())
+
+
+def _finish_entry(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo):
+    """Register an entry whose data ends at the current position (caller holds _lock)."""
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+
+
+def _sendfile_stored(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, file_path: str):
+    """Append a large ZIP_STORED file, copying its bytes kernel-side with sendfile.
+
+    The CRC is taken over an mmap view first so the header can be written up front.
+    If the first sendfile call is refused, nothing has been copied yet and the
+    bytes are written through the archive's file object instead.
+    """
+    with open(file_path, "rb") as src:
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            size = len(view)
+            zinfo.CRC = (fast_zlib or zlib).crc32(view)
+        zinfo.file_size = zinfo.compress_size = size
+        with zipf._lock:
+            _write_local_header(zipf, zinfo)
+            zipf.fp.flush()
+            out_fd = zipf.fp.fileno()
+            offset = zipf.fp.tell()
+            sent = 0
+            while sent < size:
+                try:
+                    n = os.sendfile(out_fd, src.fileno(), sent, size - sent)
+                except OSError as e:
+                    if sent:
+                        raise
+                    logger.debug("sendfile unavailable (%s), copying %s", e, file_path)
+                    zipf.fp.seek(offset)
+                    src.seek(0)
+                    shutil.copyfileobj(src, zipf.fp, STREAM_CHUNK_SIZE)
+                    break
+                if not n:
+                    raise OSError(f"{file_path} shrank while being packaged")
+                sent += n
+            # Re-sync the buffered writer with the fd position after sendfile
+            zipf.fp.seek(offset + size)
+            _finish_entry(zipf, zinfo)
+
+
+def _stream_file(
+    zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, file_path: str, compresslevel: int
+):
+    """Copy a large file into the archive in fixed-size chunks to keep memory flat.
+
+    Stored (already-compressed) files go through sendfile on Linux.
+    """
+    if zinfo.compress_type == zipfile.ZIP_STORED and USE_SENDFILE:
+        _sendfile_stored(zipf, zinfo, file_path)
+        return
+    zinfo._compresslevel = compresslevel  # what ZipFile.write() would apply
+    with open(file_path, "rb") as src, zipf.open(zinfo, "w") as dst:
+        shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+
+
+def _zipfile_internals_available() -> bool:
+    """Whether ZipFile still has the private state the raw-entry writers above use."""
+    with zipfile.ZipFile(io.BytesIO(), "w") as probe:
+        attrs = ("_lock", "_writecheck", "_didModify", "start_dir", "fp")
+        if not all(hasattr(probe, attr) for attr in attrs):
+            return False
+    return hasattr(zipfile.ZipInfo(), "_compresslevel")
+
+
+# The raw-entry writers mirror ZipFile.write() through private attributes that
+# CPython may rename; without them _write_zip uses the public API serially
+ZIPFILE_INTERNALS = _zipfile_internals_available()
+
+
 class ModulePackager:
+    # Parsed .env contents per (resolved path, mtime), shared by every packager
+    # in the process
+    _env_cache: Dict[Tuple[str, int], Dict[str, str]] = {}
+
     def __init__(
         self,
         venv_path: Optional[str] = None,
         config_path: str = "mcp_packages.json",
         env_file: str = ".env",
+        max_workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        use_cache: bool = True,
+        deep_scan: bool = False,
     ):
         # Load configuration from JSON file
         self.config = self._load_config(config_path)
@@ -89,16 +839,79 @@ class ModulePackager:
 
         self.venv_path = Path(venv_path)
         self.site_packages = self._find_site_packages()
+        # site-packages listing (name -> is_dir), read once for existence checks
+        self._sp_entries = self._scan_site_packages()
+        # First dotted component of every entry: an import whose top-level name
+        # is not here cannot match any entry, at any prefix length
+        self._sp_heads = frozenset(name.split(".", 1)[0] for name in self._sp_entries)
+        # *.dist-info / *.egg-info directory names, matched by name prefix per
+        # dependency; sorted so each prefix's matches are one bisectable run
+        self._info_names = sorted(
+            name
+            for name, is_dir in self._sp_entries.items()
+            if is_dir and name.endswith((".dist-info", ".egg-info"))
+        )
         self.dependencies: Set[str] = set()
         self.processed: Set[str] = set()
+        # Import names already examined by _check_module during this crawl
+        self._checked: Set[str] = set()
+        # Modules discovered by the import crawl but not yet parsed
+        self._pending: Deque[str] = deque()
+        # File listings of walked package directories, shared by crawl and collect
+        self._tree_files: Dict[str, List[Tuple[os.DirEntry, FrozenSet[str]]]] = {}
+        self._tree_dirs: Dict[str, List[Tuple[str, FrozenSet[str]]]] = {}
         self.external_deps: Set[str] = set()
         # For building an import tree when using AST strategy
         self.import_edges: Dict[str, Set[str]] = defaultdict(
             set
         )  # parent -> children (top-level names)
 
-        # Load excluded modules from config
-        self.excluded_modules = set(self.config.get("excluded_modules", []))
+        # Load excluded and fallback stdlib modules from config (built once)
+        self.excluded_modules = frozenset(self.config.get("excluded_modules", []))
+        self.stdlib_modules = frozenset(self.config.get("stdlib_modules", []))
+        # Everything _check_module never follows: excluded, stdlib, config stdlib
+        self._skip_modules = self.excluded_modules | _STDLIB_NAMES | self.stdlib_modules
+        # Whether any entry is dotted ("pkg.sub"); if not, only top-level names
+        # need checking against these sets
+        self._excluded_dotted = any("." in name for name in self.excluded_modules)
+        self._skip_dotted = self._excluded_dotted or any(
+            "." in name for name in self.stdlib_modules
+        )
+
+        # Skip test/vendored/example subtrees during the import crawl, and follow
+        # only module-level imports, unless deep
+        self.deep_scan = deep_scan
+        self.scan_skip_dirs = frozenset() if deep_scan else SCAN_SKIP_DIRS
+
+        # Worker processes used to parse package sources (<= 1 parses inline)
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+
+        # On-disk cache of extracted imports: path -> (mtime_ns, size, records)
+        self.use_cache = use_cache
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self._import_cache: Optional[Dict[str, ImportCacheEntry]] = None
+        self._import_cache_dirty = False
+        # Finished import crawls per root module (see _import_graph)
+        self._dep_graph_cache: Optional[
+            Dict[str, Tuple[DepGraphEntry, CrawlStamps]]
+        ] = None
+        self._dep_graph_digest: Optional[str] = None
+        # Source files and directories read by the current crawl (absolute paths)
+        self._crawl_files: Dict[str, Tuple[int, int]] = {}
+        self._crawl_dirs: Set[str] = set()
+        # Resolved metadata graphs per "root|extras" (see build_metadata_graph)
+        self._metadata_graph_cache: Optional[Dict[str, Dict]] = None
+        self._metadata_digest_value: Optional[str] = None
+
+        # Parsed Requires-Dist entries (see _parse_req) per distribution name
+        self._requires_cache: Dict[str, List[Tuple]] = {}
+
+        # Top-level module names per distribution name (see _dist_top_levels)
+        self._top_levels_cache: Dict[str, List[str]] = {}
+
+        # Lazily built map of top-level module name -> distribution names
+        self._toplevel_index: Optional[Dict[str, List[str]]] = None
 
     # ------------------------------
     # Configuration loading
@@ -122,18 +935,24 @@ class ModulePackager:
         try:
             env_file = Path(env_path)
             if env_file.exists():
-                with open(env_file, "r") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith("#") and "=" in line:
-                            key, value = line.split("=", 1)
-                            key = key.strip()
-                            # Remove inline comments and clean up value
-                            if "#" in value:
-                                value = value.split("#")[0]
-                            value = value.strip().strip('"').strip("'")
-                            if value:  # Only set non-empty values
-                                os.environ[key] = value
+                key = (str(env_file.resolve()), env_file.stat().st_mtime_ns)
+                values = self._env_cache.get(key)
+                if values is None:
+                    values = {}
+                    with open(env_file, "r") as f:
+                        for line in f:
+                            line = line.strip()
+                            if line and not line.startswith("#") and "=" in line:
+                                name, value = line.split("=", 1)
+                                name = name.strip()
+                                # Remove inline comments and clean up value
+                                if "#" in value:
+                                    value = value.split("#")[0]
+                                value = value.strip().strip('"').strip("'")
+                                if value:  # Only set non-empty values
+                                    values[name] = value
+                    self._env_cache[key] = values
+                os.environ.update(values)
                 logger.info(f"Loaded environment variables from {env_path}")
             else:
                 logger.info(
@@ -151,15 +970,20 @@ class ModulePackager:
     def _show_progress_indicator(
         self, stop_event: threading.Event, file_size_mb: float
     ):
-        """Show a progress indicator while upload is happening."""
+        """Show a progress indicator while upload is happening.
+
+        Waits on stop_event rather than sleeping, so the thread exits as soon as
+        the upload finishes instead of after its current tick.
+        """
         # Wait a moment for the initial log message to complete
-        time.sleep(0.5)
+        if stop_event.wait(0.5):
+            return
 
         spinner_chars = "|/-\\"
         spinner_idx = 0
         start_time = time.time()
 
-        while not stop_event.is_set():
+        while True:
             elapsed = time.time() - start_time
             char = spinner_chars[spinner_idx % len(spinner_chars)]
             print(
@@ -168,10 +992,14 @@ class ModulePackager:
                 flush=True,
             )
             spinner_idx += 1
-            time.sleep(0.1)
+            if stop_event.wait(0.1):
+                return
 
-    def sync_to_s3(self, zip_path: Path) -> bool:
-        """Sync the ZIP file to S3 using AWS CLI with all settings from .env file."""
+    def _aws_settings(
+        self,
+    ) -> Optional[Tuple[str, Optional[str], str, str]]:
+        """(bucket, region, access key id, secret key) from the environment file, or
+        None (logged) if the bucket or credentials are missing."""
         # Get all AWS settings from environment variables (loaded from .env)
         aws_access_key_id = os.environ.get("aws_access_key_id")
         aws_secret_access_key = os.environ.get("aws_secret_access_key")
@@ -181,13 +1009,41 @@ class ModulePackager:
         # Validate required settings
         if not bucket:
             logger.error(f"No bucket specified. Set mcp_bucket in environment file.")
-            return False
+            return None
 
         if not aws_access_key_id or not aws_secret_access_key:
             logger.error(
                 f"AWS credentials not found. Set aws_access_key_id and aws_secret_access_key in environment file."
             )
+            return None
+        return bucket, region, aws_access_key_id, aws_secret_access_key
+
+    @staticmethod
+    def _s3_client(
+        region: Optional[str],
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        endpoint_url: Optional[str] = None,
+    ):
+        """boto3 S3 client for the environment file's credentials."""
+        import boto3  # type: ignore
+
+        return boto3.session.Session(
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            region_name=region or None,
+        ).client("s3", endpoint_url=endpoint_url or None)
+
+    def sync_to_s3(self, zip_path: Path) -> bool:
+        """Sync the ZIP file to S3 with all settings from .env file.
+
+        Uses boto3's managed (multipart, parallel) upload when boto3 is installed,
+        otherwise the AWS CLI.
+        """
+        settings = self._aws_settings()
+        if settings is None:
             return False
+        bucket, region, aws_access_key_id, aws_secret_access_key = settings
 
         # Get file size for progress indicator
         file_size_bytes = zip_path.stat().st_size
@@ -196,6 +1052,22 @@ class ModulePackager:
         # Construct S3 path (directly use zip file name without prefix)
         s3_uri = f"s3://{bucket}/{zip_path.name}"
 
+        # Optional: in-process multipart upload, imported only when uploading
+        # so runs that never sync don't pay for loading boto3/botocore
+        try:
+            import boto3  # type: ignore  # noqa: F401
+        except ImportError:
+            pass  # fall back to the AWS CLI
+        else:
+            return self._upload_with_boto3(
+                zip_path,
+                bucket,
+                region,
+                aws_access_key_id,
+                aws_secret_access_key,
+                file_size_mb,
+            )
+
         # Build AWS CLI command
         cmd = ["aws", "s3", "cp", str(zip_path), s3_uri]
 
@@ -258,64 +1130,362 @@ class ModulePackager:
             )
             return False
 
+    def _upload_with_boto3(
+        self,
+        zip_path: Path,
+        bucket: str,
+        region: Optional[str],
+        aws_access_key_id: str,
+        aws_secret_access_key: str,
+        file_size_mb: float,
+    ) -> bool:
+        """Upload the ZIP with boto3's transfer manager, reporting bytes sent."""
+        from boto3.s3.transfer import TransferConfig  # type: ignore
+
+        s3_uri = f"s3://{bucket}/{zip_path.name}"
+        logger.info(
+            f"Using AWS settings from environment file (bucket: {bucket}, region: {region})"
+        )
+        client = self._s3_client(region, aws_access_key_id, aws_secret_access_key)
+        config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=S3_MAX_CONCURRENCY,
+            use_threads=True,
+        )
+
+        # Called from the transfer threads with the bytes each chunk just sent
+        lock = threading.Lock()
+        sent = [0]
+        start_time = time.time()
+
+        def progress(bytes_amount: int):
+            with lock:
+                sent[0] += bytes_amount
+                print(
+                    f"\r  Uploading {sent[0] / (1024 * 1024):.1f}/{file_size_mb:.1f}MB"
+                    f" to S3... ({time.time() - start_time:.1f}s)",
+                    end="",
+                    flush=True,
+                )
+
+        try:
+            logger.info(
+                f"Syncing {zip_path.name} ({file_size_mb:.1f}MB) to {s3_uri}..."
+            )
+            client.upload_file(
+                str(zip_path),
+                bucket,
+                zip_path.name,
+                Config=config,
+                Callback=progress,
+            )
+        except Exception as e:
+            print(f"\r✗ Upload failed" + " " * 50)
+            print()  # Add newline for clean output
+            logger.error(f"Failed to sync to S3: {e}")
+            return False
+
+        print(
+            f"\r✓ Successfully uploaded {file_size_mb:.1f}MB to S3: {s3_uri}" + " " * 20
+        )
+        print()  # Add newline for clean output
+        logger.info(f"Successfully synced to S3: {s3_uri}")
+        return True
+
+    def sync_bundle_to_s3(
+        self, files_to_package: List[Tuple[str, str]], module_name: str
+    ) -> bool:
+        """Upload the collected files as one tar that the endpoint extracts.
+
+        The tar is PUT with snowball-auto-extract metadata, which only Snowball
+        Edge and MinIO honour (standard AWS S3 ignores it and would store one
+        opaque tar), so this needs s3_endpoint_url in the environment file.
+        Those endpoints unpack it under ``<module_name>/`` instead of the client
+        paying one request per file. Requires boto3.
+        """
+        endpoint_url = os.environ.get("s3_endpoint_url")
+        if not endpoint_url:
+            logger.warning(
+                "Snowball auto-extract is only supported by Snowball Edge / MinIO; "
+                "set s3_endpoint_url in the environment file. Skipping the bundle upload."
+            )
+            return False
+        try:
+            import boto3  # type: ignore  # noqa: F401
+        except ImportError:
+            logger.error("Snowball upload requires boto3 (pip install boto3)")
+            return False
+        settings = self._aws_settings()
+        if settings is None:
+            return False
+        bucket, region, aws_access_key_id, aws_secret_access_key = settings
+        key = f"{module_name}/{module_name}.tar"
+        s3_uri = f"s3://{bucket}/{key}"
+
+        # Small bundles stay in memory; large ones spill to a temporary file
+        with tempfile.SpooledTemporaryFile(max_size=STREAM_THRESHOLD) as bundle:
+            with tarfile.open(fileobj=bundle, mode="w|") as tar:
+                for archive_path, file_path in files_to_package:
+                    tar.add(file_path, arcname=archive_path, recursive=False)
+            size_mb = bundle.tell() / (1024 * 1024)
+            bundle.seek(0)
+            logger.info(
+                f"Uploading {len(files_to_package)} files as one {size_mb:.1f}MB "
+                f"auto-extract bundle to {s3_uri}..."
+            )
+            try:
+                client = self._s3_client(
+                    region, aws_access_key_id, aws_secret_access_key, endpoint_url
+                )
+                client.put_object(
+                    Bucket=bucket,
+                    Key=key,
+                    Body=bundle,
+                    Metadata={"snowball-auto-extract": "true"},
+                )
+            except Exception as e:
+                logger.error(f"Failed to upload bundle to S3: {e}")
+                return False
+        logger.info(f"Successfully uploaded bundle to S3: {s3_uri}")
+        return True
+
     # ------------------------------
     # Environment discovery
     # ------------------------------
     def _find_site_packages(self) -> Path:
-        """Find site-packages directory in venv"""
-        possible_paths = [
-            self.venv_path / "lib" / "python3.12" / "site-packages",
-            self.venv_path / "lib" / "python3.11" / "site-packages",
-            self.venv_path / "lib" / "python3.10" / "site-packages",
-            self.venv_path / "lib" / "python3.9" / "site-packages",
-            self.venv_path / "Lib" / "site-packages",  # Windows
-        ]
+        """Find site-packages directory in venv (newest lib/pythonX.Y wins).
+
+        A venv's pyvenv.cfg names its Python version, so that directory is tried
+        first and the globs only run when it is missing or does not match.
+        """
+        cfg_version = self._pyvenv_version()
+        if cfg_version:
+            path = self.venv_path / "lib" / f"python{cfg_version}" / "site-packages"
+            if path.is_dir():
+                logger.info(f"Found site-packages at: {path}")
+                return path
+
+        def version_key(path: Path) -> Tuple[int, ...]:
+            # lib/python3.12/site-packages -> (3, 12)
+            digits = re.findall(r"\d+", path.parent.name)
+            return tuple(int(d) for d in digits)
+
+        possible_paths = sorted(
+            [
+                *self.venv_path.glob("lib/python*/site-packages"),
+                *self.venv_path.glob("lib64/python*/site-packages"),
+            ],
+            key=version_key,
+            reverse=True,
+        )
+        possible_paths.append(self.venv_path / "Lib" / "site-packages")  # Windows
         for path in possible_paths:
-            if path.exists():
+            if path.is_dir():
                 logger.info(f"Found site-packages at: {path}")
                 return path
-        raise ValueError(f"Could not find site-packages in {self.venv_path}")
+        tried = ", ".join(str(path) for path in possible_paths)
+        raise ValueError(
+            f"Could not find site-packages in {self.venv_path} (tried: {tried})"
+        )
+
+    def _pyvenv_version(self) -> Optional[str]:
+        """ "X.Y" from the venv's pyvenv.cfg (version / version_info key), if any."""
+        try:
+            with open(self.venv_path / "pyvenv.cfg", encoding="utf-8") as f:
+                for line in f:
+                    key, sep, value = line.partition("=")
+                    if sep and key.strip() in ("version", "version_info"):
+                        match = re.match(r"(\d+)\.(\d+)", value.strip())
+                        if match:
+                            return f"{match.group(1)}.{match.group(2)}"
+        except OSError:
+            pass
+        return None
+
+    def _scan_site_packages(self) -> Dict[str, bool]:
+        """List site-packages once, mapping each entry name to whether it is a directory."""
+        with os.scandir(self.site_packages) as it:
+            return {entry.name: entry.is_dir() for entry in it}
+
+    def _package_files(
+        self, package_dir: str, skip_dirs: FrozenSet[str] = frozenset()
+    ) -> List[os.DirEntry]:
+        """Files below a site-packages directory outside skip_dirs.
+
+        The directory is walked once per packager, so the import crawl and file
+        collection share one listing.
+        """
+        files = self._tree_files.get(package_dir)
+        if files is None:
+            self._tree_dirs[package_dir] = []
+            files = self._tree_files[package_dir] = _list_tree(
+                package_dir, self._tree_dirs[package_dir]
+            )
+        if not skip_dirs:
+            return [entry for entry, _ in files]
+        return [entry for entry, dirs in files if dirs.isdisjoint(skip_dirs)]
+
+    def _package_dirs(
+        self, package_dir: str, skip_dirs: FrozenSet[str] = frozenset()
+    ) -> List[str]:
+        """Directories _package_files read below package_dir, outside skip_dirs."""
+        self._package_files(package_dir)
+        return [
+            path
+            for path, dirs in self._tree_dirs[package_dir]
+            if dirs.isdisjoint(skip_dirs)
+        ]
+
+    def _info_dirs_with_prefix(self, prefix: str) -> List[Path]:
+        """dist-info/egg-info directories whose name starts with prefix."""
+        names = self._info_names
+        matches = []
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            matches.append(self.site_packages / names[i])
+        return matches
 
     # ------------------------------
     # IMPORT (AST) STRATEGY
     # ------------------------------
-    def find_module_dependencies(self, module_name: str):
-        """Recursively find all dependencies for a module by walking its imports."""
-        if module_name in self.processed:
-            return
-        self.processed.add(module_name)
+    def find_module_dependencies(self, module_name: str) -> FrozenSet[str]:
+        """Find all transitive dependencies for a module by walking its imports.
 
+        Iterative worklist: modules found by _check_module are queued rather than
+        recursed into, so deep dependency chains cannot hit the recursion limit.
+        Returns the external (site-packages) modules found so far.
+        """
+        self._queue_module(module_name)
+        try:
+            while self._pending:
+                self._process_module(self._pending.popleft())
+        finally:
+            self._close_parse_pool()
+        return frozenset(self.external_deps)
+
+    def _import_graph(self, module_name: str) -> DepGraphEntry:
+        """Run a fresh import crawl for module_name, memoised per packager and on disk.
+
+        On a hit the crawl state (external_deps, import_edges) is restored from the
+        cached result instead of re-walking the imports.
+        """
+        graphs = self._load_dep_graph_cache()
+        cached = graphs.get(module_name)
+        if cached is not None and self._crawl_unchanged(cached[1]):
+            logger.info("Using cached import graph for %s", module_name)
+            deps, edges = cached[0]
+            self.external_deps = set(deps)
+            self.import_edges = defaultdict(
+                set, {parent: set(kids) for parent, kids in edges.items()}
+            )
+            return cached[0]
+
+        self.external_deps.clear()
+        self.processed.clear()
+        self._checked.clear()
+        self._pending.clear()
+        self.import_edges.clear()
+        self._crawl_files.clear()
+        self._crawl_dirs.clear()
+        deps = self.find_module_dependencies(module_name)
+        self.save_import_cache()
+        result = (
+            deps,
+            {parent: frozenset(kids) for parent, kids in self.import_edges.items()},
+        )
+        graphs[module_name] = (result, self._crawl_stamps())
+        self._save_dep_graph_cache()
+        return result
+
+    def _crawl_stamps(self) -> CrawlStamps:
+        """Stamps of the files and directories the last crawl read."""
+        root = str(self.site_packages)
+        dirs: Dict[str, int] = {}
+        for dir_path in self._crawl_dirs:
+            try:
+                dirs[os.path.relpath(dir_path, root)] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                continue
+        files = {
+            os.path.relpath(file_path, root): stamp
+            for file_path, stamp in self._crawl_files.items()
+        }
+        return files, dirs
+
+    def _crawl_unchanged(self, stamps: CrawlStamps) -> bool:
+        """True if no file or directory a cached crawl read has changed since."""
+        files, dirs = stamps
+        join = os.path.join
+        root = str(self.site_packages)
+        try:
+            for rel_path, stamp in files.items():
+                st = os.stat(join(root, rel_path))
+                if (st.st_mtime_ns, st.st_size) != stamp:
+                    return False
+            for rel_path, mtime_ns in dirs.items():
+                if os.stat(join(root, rel_path)).st_mtime_ns != mtime_ns:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def _queue_module(self, module_name: str) -> None:
+        """Mark a module as processed and queue it for the crawl (once)."""
+        if module_name not in self.processed:
+            self.processed.add(module_name)
+            self._pending.append(module_name)
+
+    def _process_module(self, module_name: str) -> None:
+        """Parse one queued module's sources and queue what it imports."""
         # Check if module or any of its parent modules are excluded
-        module_parts = module_name.split(".")
-        is_excluded = False
-        for i in range(1, len(module_parts) + 1):
-            parent_module = ".".join(module_parts[:i])
-            if parent_module in self.excluded_modules:
-                is_excluded = True
-                logger.info(
-                    f"Found excluded module (will skip in packaging): {module_name} (parent {parent_module} is excluded)"
-                )
-                break
+        parent_module = _matching_parent(
+            module_name, self.excluded_modules, self._excluded_dotted
+        )
+        is_excluded = parent_module is not None
+        if is_excluded:
+            logger.info(
+                "Found excluded module (will skip in packaging): %s (parent %s is excluded)",
+                module_name,
+                parent_module,
+            )
 
         if not is_excluded:
-            logger.info(f"Processing dependency: {module_name}")
+            logger.info("Processing dependency: %s", module_name)
 
         try:
             module_path = self.site_packages / module_name
-            if module_path.exists():
+            if module_name in self._sp_entries:
                 if not is_excluded:
                     self.external_deps.add(module_name)
-                if module_path.is_dir():
-                    for py_file in module_path.rglob("*.py"):
-                        if py_file.is_file():
-                            self._parse_imports(py_file, module_name)
+                if self._sp_entries[module_name]:
+                    py_files = [
+                        entry.path
+                        for entry in self._package_files(
+                            str(module_path), self.scan_skip_dirs
+                        )
+                        if entry.name.endswith(".py")
+                    ]
+                    # New or removed sources change their directory's mtime
+                    self._crawl_dirs.update(
+                        self._package_dirs(str(module_path), self.scan_skip_dirs)
+                    )
+                    for file_path, records, error in self._extract_imports_batch(
+                        py_files
+                    ):
+                        if error is not None:
+                            logger.error(f"Error parsing {file_path}: {error}")
+                            continue
+                        self._record_imports(records, module_name)
                 else:
-                    py_file = self.site_packages / f"{module_name}.py"
-                    if py_file.exists():
-                        self._parse_imports(py_file, module_name)
+                    if f"{module_name}.py" in self._sp_entries:
+                        self._parse_imports(
+                            self.site_packages / f"{module_name}.py", module_name
+                        )
             else:
                 try:
-                    spec = importlib.util.find_spec(module_name)
+                    spec = _find_spec_cached(module_name)
                     if spec and spec.origin:
                         module_file = Path(spec.origin)
                         if str(self.site_packages) in str(module_file):
@@ -324,14 +1494,14 @@ class ModulePackager:
                             self._parse_imports(module_file, module_name)
                         else:
                             logger.debug(
-                                f"Skipping {module_name}: not in site-packages"
+                                "Skipping %s: not in site-packages", module_name
                             )
                 except Exception as e:
                     logger.warning(f"Could not find or parse {module_name}: {e}")
         except Exception as e:
             logger.error(f"Error processing {module_name}: {e}")
 
-    def _record_edge(self, parent: Optional[str], child: Optional[str]):
+    def _record_edge(self, parent: Optional[str], child: Optional[str]) -> None:
         if not parent or not child:
             return
         p = parent.split(".")[0]
@@ -339,145 +1509,377 @@ class ModulePackager:
         if p != c:  # avoid self-edge
             self.import_edges[p].add(c)
 
-    def _parse_imports(self, file_path: Path, current_module: Optional[str] = None):
-        """Parse import statements from a Python file using AST and record edges."""
+    def _cache_file(self, template: Optional[str] = None) -> Path:
+        """Cache file for this packager's site-packages, so venvs don't share one.
+
+        Without a template, the import cache for the current scan mode.
+        """
+        if template is None:
+            template = DEEP_IMPORT_CACHE_FILE if self.deep_scan else IMPORT_CACHE_FILE
+        key = hashlib.sha1(str(self.site_packages).encode()).hexdigest()[:16]
+        return self.cache_dir / template.format(key=key)
+
+    def _load_import_cache(self) -> Dict[str, ImportCacheEntry]:
+        """Load the on-disk import cache once per packager."""
+        if self._import_cache is None:
+            self._import_cache = {}
+            cache_file = self._cache_file()
+            if self.use_cache and cache_file.exists():
+                try:
+                    with open(cache_file, "rb") as f:
+                        version, entries = pickle.load(f)
+                    if version == IMPORT_CACHE_VERSION:
+                        self._import_cache = entries
+                except Exception as e:
+                    logger.warning(
+                        f"Ignoring unreadable import cache {cache_file}: {e}"
+                    )
+        return self._import_cache
+
+    def save_import_cache(self) -> None:
+        """Persist newly extracted imports (atomic replace of the cache file)."""
+        if not self.use_cache or not self._import_cache_dirty:
+            return
         try:
-            content = Path(file_path).read_text(encoding="utf-8", errors="ignore")
-            import ast
-
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        self._record_edge(current_module, alias.name)
-                        self._check_module(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        self._record_edge(current_module, node.module)
-                        self._check_module(node.module)
-                    elif node.level > 0 and current_module:
-                        if node.level == 1:
-                            if "." in current_module:
-                                parent_module = ".".join(current_module.split(".")[:-1])
-                                for alias in node.names:
-                                    if alias.name != "*":
-                                        full_name = (
-                                            f"{parent_module}.{alias.name}"
-                                            if parent_module
-                                            else alias.name
-                                        )
-                                        self._record_edge(current_module, full_name)
-                                        self._check_module(full_name)
-                            else:
-                                for alias in node.names:
-                                    if alias.name != "*":
-                                        self._record_edge(current_module, alias.name)
-                                        self._check_module(alias.name)
-                    if node.module:
-                        for alias in node.names:
-                            if alias.name != "*":
-                                full_name = f"{node.module}.{alias.name}"
-                                self._record_edge(current_module, full_name)
-                                self._check_module(full_name)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self._cache_file()
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump(
+                    (IMPORT_CACHE_VERSION, self._import_cache),
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_file, cache_file)
+            self._import_cache_dirty = False
         except Exception as e:
-            logger.error(f"Error parsing {file_path}: {e}")
+            logger.warning(f"Could not write import cache to {self.cache_dir}: {e}")
 
-    def _check_module(self, module_name: str):
-        """If module is in site-packages, queue it for recursive processing."""
-        if not module_name or module_name in self.processed:
-            return
+    def _site_packages_digest(self) -> str:
+        """Fingerprint of what a finished crawl depends on.
 
-        # Check if module or any of its parent modules are excluded
-        module_parts = module_name.split(".")
-        for i in range(1, len(module_parts) + 1):
-            parent_module = ".".join(module_parts[:i])
+        Covers each top-level site-packages entry with its mtime (installs and
+        upgrades replace package and dist-info directories) plus the skip rules.
+        """
+        if self._dep_graph_digest is None:
+            with os.scandir(self.site_packages) as it:
+                stamps = sorted(
+                    (entry.name, entry.stat(follow_symlinks=False).st_mtime_ns)
+                    for entry in it
+                )
+            settings = (
+                IMPORT_CACHE_VERSION,
+                self.deep_scan,
+                sorted(self.excluded_modules),
+                sorted(self._skip_modules),
+                sorted(self.scan_skip_dirs),
+            )
+            self._dep_graph_digest = hashlib.sha1(
+                repr((stamps, settings)).encode()
+            ).hexdigest()
+        return self._dep_graph_digest
 
-            # Check against excluded modules
-            if parent_module in self.excluded_modules:
-                logger.debug(
-                    f"Skipping {module_name}: parent {parent_module} is excluded"
+    def _load_dep_graph_cache(
+        self,
+    ) -> Dict[str, Tuple[DepGraphEntry, CrawlStamps]]:
+        """Load cached crawl results once per packager, dropping them if stale.
+
+        Per-file stamps are checked on use, in _import_graph.
+        """
+        if self._dep_graph_cache is None:
+            entries = self._read_json_cache(
+                DEP_GRAPH_CACHE_FILE, self._site_packages_digest
+            )
+            self._dep_graph_cache = {
+                module: (
+                    (
+                        frozenset(entry["deps"]),
+                        {
+                            parent: frozenset(kids)
+                            for parent, kids in entry["edges"].items()
+                        },
+                    ),
+                    (
+                        {path: tuple(stamp) for path, stamp in entry["files"].items()},
+                        entry["dirs"],
+                    ),
                 )
-                return
+                for module, entry in entries.items()
+                # Entries written before per-file stamps existed are stale
+                if "files" in entry and "dirs" in entry
+            }
+        return self._dep_graph_cache
+
+    def _save_dep_graph_cache(self) -> None:
+        """Persist crawl results (atomic replace of the cache file)."""
+        self._write_json_cache(
+            DEP_GRAPH_CACHE_FILE,
+            self._site_packages_digest,
+            {
+                module: {
+                    "deps": sorted(deps),
+                    "edges": {
+                        parent: sorted(kids) for parent, kids in sorted(edges.items())
+                    },
+                    "files": files,
+                    "dirs": dirs,
+                }
+                for module, (
+                    (deps, edges),
+                    (files, dirs),
+                ) in self._dep_graph_cache.items()
+            },
+        )
 
-        # Prefer Python's own stdlib listing when available (3.10+)
+    def _read_json_cache(self, template: str, digest: Callable[[], str]) -> Dict:
+        """Entries of a JSON cache file; empty if missing, unreadable or stale.
+
+        The file stores the fingerprint it was written under; digest() is only
+        computed when there is a file to check it against.
+        """
+        cache_file = self._cache_file(template)
+        if not self.use_cache or not cache_file.exists():
+            return {}
         try:
-            stdlib_names = getattr(sys, "stdlib_module_names", set())
-            # Check if any parent module is in stdlib
-            for i in range(1, len(module_parts) + 1):
-                parent_module = ".".join(module_parts[:i])
-                if parent_module in stdlib_names:
-                    logger.debug(
-                        f"Skipping {module_name}: parent {parent_module} is stdlib"
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("digest") == digest():
+                return data.get("entries", {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache {cache_file}: {e}")
+        return {}
+
+    def _write_json_cache(
+        self, template: str, digest: Callable[[], str], entries: Dict
+    ) -> None:
+        """Write a JSON cache file under the current fingerprint (atomic replace)."""
+        if not self.use_cache:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = self._cache_file(template)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"digest": digest(), "entries": entries}, f)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"Could not write cache to {self.cache_dir}: {e}")
+
+    def _extract_imports_batch(
+        self, py_files: List[str]
+    ) -> List[Tuple[str, List[ImportRecord], Optional[str]]]:
+        """Extract imports from many files, serving unchanged files from the cache
+        and fanning the rest out to a process pool when worthwhile."""
+        cache = self._load_import_cache()
+        results: Dict[str, Tuple[str, List[ImportRecord], Optional[str]]] = {}
+        stamps: Dict[str, Tuple[int, int]] = {}
+        misses: List[str] = []
+        for file_path in py_files:
+            try:
+                st = os.stat(file_path)
+            except OSError as e:
+                results[file_path] = (file_path, [], str(e))
+                continue
+            stamp = (st.st_mtime_ns, st.st_size)
+            self._crawl_files[file_path] = stamp
+            cached = cache.get(file_path)
+            if cached is not None and cached[:2] == stamp:
+                results[file_path] = (file_path, cached[2], None)
+            else:
+                stamps[file_path] = stamp
+                misses.append(file_path)
+
+        for result in self._parse_files(misses):
+            file_path, records, error = result
+            if error is None:
+                cache[file_path] = (*stamps[file_path], records)
+                self._import_cache_dirty = True
+            results[file_path] = result
+
+        return [results[file_path] for file_path in py_files]
+
+    def _parse_files(
+        self, py_files: List[str]
+    ) -> List[Tuple[str, List[ImportRecord], Optional[str]]]:
+        """Parse files for imports, using a process pool for large batches."""
+        if (
+            self.max_workers
+            and self.max_workers > 1
+            and len(py_files) >= PARALLEL_PARSE_THRESHOLD
+        ):
+            try:
+                executor = self._get_parse_pool()
+                return list(
+                    executor.map(
+                        _extract_imports_worker,
+                        py_files,
+                        repeat(self.deep_scan),
+                        chunksize=32,
                     )
-                    return
-        except Exception:
-            pass
-
-        # Load stdlib modules from config
-        stdlib_modules = set(self.config.get("stdlib_modules", []))
-        # Check if any parent module is in stdlib (fallback)
-        for i in range(1, len(module_parts) + 1):
-            parent_module = ".".join(module_parts[:i])
-            if parent_module in stdlib_modules:
-                logger.debug(
-                    f"Skipping {module_name}: parent {parent_module} is stdlib (fallback)"
                 )
-                return
+            except Exception as e:
+                logger.warning(f"Parallel parsing unavailable, parsing serially: {e}")
+                self._close_parse_pool()
+        return [
+            _extract_imports_worker(file_path, self.deep_scan) for file_path in py_files
+        ]
+
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Return the crawl's process pool, starting it on first use.
+
+        One pool serves every package in a crawl, so workers are forked once
+        rather than once per package directory.
+        """
+        if self._parse_pool is None:
+            # fork avoids re-importing this module in every worker on Linux
+            mp_context = (
+                multiprocessing.get_context("fork")
+                if sys.platform.startswith("linux")
+                else None
+            )
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=mp_context
+            )
+        return self._parse_pool
+
+    def _close_parse_pool(self) -> None:
+        """Shut down the crawl's process pool, if one was started."""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
 
-        parts = module_name.split(".")
-        # Check for dependencies in site-packages
-        for i in range(len(parts), 0, -1):
-            partial = ".".join(parts[:i])
-            ext_path = self.site_packages / partial
-            if ext_path.exists():
-                if partial not in self.processed:
-                    self.find_module_dependencies(partial)
+    def _parse_imports(
+        self, file_path: Path, current_module: Optional[str] = None
+    ) -> None:
+        """Parse import statements from a Python file using AST and record edges."""
+        for _, records, error in self._extract_imports_batch([str(file_path)]):
+            if error is not None:
+                logger.error(f"Error parsing {file_path}: {error}")
                 return
+            self._record_imports(records, current_module)
+
+    def _record_imports(
+        self, records: Iterable[ImportRecord], current_module: Optional[str] = None
+    ) -> None:
+        """Record edges for extracted imports and queue site-packages modules."""
+        # Hot loop: bind bound methods to locals once
+        record = self._record_edge
+        check = self._check_module
+        for module, level, names in records:
+            # Prefix that each imported name resolves under
+            if module:
+                # "from a.b import c" (or the relative "from .b import c"):
+                # the module itself, then each name beneath it
+                prefix = module
+                record(current_module, module)
+                check(module)
+            elif level == 0:
+                prefix = ""  # "import a, b.c"
+            elif level == 1 and current_module:
+                # "from . import c": current_module is the crawled module, so
+                # resolve against its parent package
+                prefix = current_module.rpartition(".")[0]
+            else:
+                continue
+            for name in names:
+                if name != "*":
+                    full_name = f"{prefix}.{name}" if prefix else name
+                    record(current_module, full_name)
+                    check(full_name)
+
+    def _check_module(self, module_name: str) -> None:
+        """If module is in site-packages, queue it for processing."""
+        if not module_name or module_name in self.processed:
+            return
+        # A repeat check can only find modules that are queued by now, so each
+        # name (hit or miss) is examined once per crawl
+        if module_name in self._checked:
+            return
+        self._checked.add(module_name)
 
-        # Try common name variations
-        base = parts[0]
-        variations = [base, base.replace("_", "-"), base.replace("-", "_")]
-        for v in variations:
-            ext_path = self.site_packages / v
-            if ext_path.exists() and v not in self.processed:
-                self.find_module_dependencies(v)
+        # Fast reject: nothing in site-packages starts with the top-level name,
+        # and it has no '_'/'-' spelling variant to try
+        base = module_name.split(".", 1)[0]
+        if base not in self._sp_heads and "_" not in base and "-" not in base:
+            return
+
+        # Skip if the module or any parent is excluded or stdlib
+        parent_module = _matching_parent(
+            module_name, self._skip_modules, self._skip_dotted
+        )
+        if parent_module is not None:
+            if parent_module in self.excluded_modules:
+                reason = "excluded"
+            elif parent_module in _STDLIB_NAMES:
+                reason = "stdlib"
+            else:
+                reason = "stdlib (fallback)"
+            logger.debug(
+                "Skipping %s: parent %s is %s", module_name, parent_module, reason
+            )
+            return
+
+        # Check for dependencies in site-packages, longest prefix first
+        # ("a.b.c" -> "a.b.c", "a.b", "a")
+        module_parts = module_name.split(".")
+        prefixes = [".".join(module_parts[:i]) for i in range(1, len(module_parts) + 1)]
+        for partial in reversed(prefixes):
+            if partial in self._sp_entries:
+                self._queue_module(partial)
                 return
 
+        # Try common name variations (the base name itself was checked above)
+        if "_" in base or "-" in base:
+            for v in (base.replace("_", "-"), base.replace("-", "_")):
+                if v in self._sp_entries and v not in self.processed:
+                    self._queue_module(v)
+                    return
+
     # ------------------------------
     # METADATA STRATEGY
     # ------------------------------
-    def _dist_top_levels(self, dist: importlib.metadata.Distribution) -> List[str]:
-        """Return top-level importable names for a distribution (best-effort)."""
-        try:
-            files = list(dist.files or [])
-            for f in files:
-                if f.name.endswith("top_level.txt"):
-                    txt = dist.read_text(str(f)) or ""
-                    lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
-                    if lines:
-                        return lines
-        except Exception:
-            pass
-        name = (dist.metadata.get("Name") or "").strip()
-        return [name.replace("-", "_")] if name else []
+    def _dist_top_levels(
+        self, dist: importlib.metadata.Distribution, name: Optional[str] = None
+    ) -> List[str]:
+        """Return top-level importable names for a distribution (best-effort).
 
-    def _normalize_req(self, req_str: str):
-        """Parse a Requires-Dist entry into (name, extras, marker)."""
+        Memoised per distribution name; pass the name when the caller already has
+        it to avoid re-reading METADATA.
+        """
+        if name is None:
+            name = dist.metadata.get("Name") or ""
+        name = name.strip()
+        cached = self._top_levels_cache.get(name)
+        if cached is not None:
+            return cached
+        lines: List[str] = []
         try:
-            r = Requirement(req_str)
-            return (
-                getattr(r, "name", None),
-                getattr(r, "extras", set()),
-                getattr(r, "marker", None),
-            )
+            # Read from the metadata directory directly; dist.files would parse RECORD
+            txt = dist.read_text("top_level.txt") or ""
+            lines = [ln.strip() for ln in txt.splitlines() if ln.strip()]
         except Exception:
-            # very naive fallback: take token until first space/;/(
-            s = req_str.strip()
-            cut = len(s)
-            for sep in [";", "(", " "]:
-                if sep in s:
-                    cut = min(cut, s.index(sep))
-            return s[:cut], set(), None
+            pass
+        if not lines and name:
+            lines = [name.replace("-", "_")]
+        if name:
+            self._top_levels_cache[name] = lines
+        return lines
+
+    def _top_level_index(self) -> Dict[str, List[str]]:
+        """Map each top-level module name to the distributions providing it (built once)."""
+        if self._toplevel_index is None:
+            index: Dict[str, List[str]] = defaultdict(list)
+            try:
+                for dist in importlib.metadata.distributions():
+                    name = dist.metadata.get("Name", "")
+                    if not name:
+                        continue
+                    for top in set(self._dist_top_levels(dist, name)):
+                        index[top].append(name)
+            except Exception:
+                pass
+            self._toplevel_index = dict(index)
+        return self._toplevel_index
 
     def build_metadata_graph(self, root_dist_name: str, include_extras: bool = False):
         """
@@ -486,7 +1888,63 @@ class ModulePackager:
           dep_dists: distribution names
           dep_modules: top-level module names
           tree: adjacency list mapping parent dist -> set(child dists)
+        Results are cached on disk until installed metadata changes.
         """
+        if self._metadata_graph_cache is None:
+            self._metadata_graph_cache = self._read_json_cache(
+                METADATA_GRAPH_CACHE_FILE, self._metadata_digest
+            )
+        key = f"{root_dist_name}|{int(include_extras)}"
+        cached = self._metadata_graph_cache.get(key)
+        if cached is not None:
+            logger.info("Using cached metadata graph for %s", root_dist_name)
+            tree: Dict[str, Set[str]] = defaultdict(set)
+            for parent, kids in cached["tree"].items():
+                tree[parent] = set(kids)
+            return set(cached["dists"]), set(cached["modules"]), tree
+
+        dep_dists, dep_modules, tree = self._resolve_metadata_graph(
+            root_dist_name, include_extras
+        )
+        self._metadata_graph_cache[key] = {
+            "dists": sorted(dep_dists),
+            "modules": sorted(dep_modules),
+            "tree": {parent: sorted(kids) for parent, kids in sorted(tree.items())},
+        }
+        self._write_json_cache(
+            METADATA_GRAPH_CACHE_FILE,
+            self._metadata_digest,
+            self._metadata_graph_cache,
+        )
+        return dep_dists, dep_modules, tree
+
+    def _metadata_digest(self) -> str:
+        """Fingerprint of the metadata importlib.metadata resolves against.
+
+        Lookups and marker evaluation use the running interpreter, so this covers
+        its version plus every dist-info/egg-info entry (with mtime) on sys.path.
+        """
+        if self._metadata_digest_value is None:
+            stamps = []
+            for path_entry in sys.path:
+                try:
+                    with os.scandir(path_entry or ".") as it:
+                        stamps.extend(
+                            sorted(
+                                (entry.path, entry.stat().st_mtime_ns)
+                                for entry in it
+                                if entry.name.endswith((".dist-info", ".egg-info"))
+                            )
+                        )
+                except OSError:
+                    continue
+            self._metadata_digest_value = hashlib.sha1(
+                repr((sys.executable, sys.version, stamps)).encode()
+            ).hexdigest()
+        return self._metadata_digest_value
+
+    def _resolve_metadata_graph(self, root_dist_name: str, include_extras: bool):
+        """Walk Requires-Dist from root_dist_name (uncached build_metadata_graph)."""
         seen: Set[str] = set()
         stack: List[str] = [root_dist_name]
         dep_dists: Set[str] = set()
@@ -506,23 +1964,26 @@ class ModulePackager:
                 logger.warning(f"Distribution not found: {name}")
                 continue
 
-            dist_name = dist.metadata.get("Name", name)
+            # dist.metadata re-reads METADATA on every access; read it once
+            metadata = dist.metadata
+            dist_name = metadata.get("Name", name)
             dep_dists.add(dist_name)
 
             # Map distribution → top-level modules
-            for top in self._dist_top_levels(dist):
+            for top in self._dist_top_levels(dist, metadata.get("Name")):
                 dep_modules.add(top)
 
             # Follow transitive requirements
-            for req_str in dist.metadata.get_all("Requires-Dist") or []:
-                rname, extras, marker = self._normalize_req(req_str)
-                if not rname:
+            requires = self._requires_cache.get(dist_name)
+            if requires is None:
+                requires = [
+                    _parse_req(req_str)
+                    for req_str in metadata.get_all("Requires-Dist") or []
+                ]
+                self._requires_cache[dist_name] = requires
+            for rname, extras, applies in requires:
+                if not rname or not applies:
                     continue
-                try:
-                    if marker and hasattr(marker, "evaluate") and not marker.evaluate():
-                        continue
-                except Exception:
-                    pass  # if packaging not present, ignore marker
                 if extras and not include_extras:
                     continue
                 tree[dist_name].add(rname)
@@ -577,96 +2038,117 @@ class ModulePackager:
                 logger.info(f"Metadata resolution failed for '{module_or_dist}': {e}")
 
         # Fallback to AST import walker
-        self.external_deps.clear()
-        self.processed.clear()
-        self.import_edges.clear()
-        self.find_module_dependencies(module_or_dist)
-        dep_modules |= set(self.external_deps)
+        dep_modules |= self._import_graph(module_or_dist)[0]
         tree_kind = "imports"
 
         # Best-effort: infer distributions for discovered modules
-        try:
-            for dist in importlib.metadata.distributions():
-                tops = set(self._dist_top_levels(dist))
-                if any(m.split(".")[0] in tops for m in dep_modules):
-                    name = dist.metadata.get("Name", "")
-                    if name:
-                        dep_dists.add(name)
-        except Exception:
-            pass
+        index = self._top_level_index()
+        for m in dep_modules:
+            dep_dists.update(index.get(m.split(".")[0], ()))
 
         return dep_modules, dep_dists, self.import_edges, tree_kind
 
     # ------------------------------
     # FILE COLLECTION & PACKAGING
     # ------------------------------
-    def collect_modules_by_names(self, module_names: Set[str]):
-        """Collect files for a set of top-level module names (reuses existing rules)."""
-        files_to_package: Dict[str, Path] = {}
+    def collect_modules_by_names(
+        self, module_names: Set[str], prune: bool = False
+    ) -> List[Tuple[str, str]]:
+        """Collect files for a set of top-level module names (reuses existing rules).
+
+        Returns (archive path, source path) pairs, each archive path once. With
+        prune=True, test directories, .pyi stubs and dist-info RECORD files
+        (which would list the pruned paths) are left out.
+        """
+        files_to_package: List[Tuple[str, str]] = []
+        # Archive paths already listed; the first source for a path wins
+        seen: Set[str] = set()
+        add = files_to_package.append
+        skip_dirs = PRUNE_DIRS if prune else frozenset()
+
+        # Several deps can prefix-match one dist-info (e.g. "attr" and "attrs");
+        # walk each directory once
+        collected_info_dirs: Set[Path] = set()
+
+        # Walked paths all start with "<site-packages>/", so archive names are a
+        # slice of entry.path rather than a Path.relative_to() per file
+        sp_len = len(str(self.site_packages)) + 1
+        to_posix = os.sep != "/"
+
         for dep in sorted(set(module_names)):
             # Check if module or any of its parent modules are excluded
-            module_parts = dep.split(".")
-            is_excluded = False
-            for i in range(1, len(module_parts) + 1):
-                parent_module = ".".join(module_parts[:i])
-                if parent_module in self.excluded_modules:
-                    is_excluded = True
-                    logger.info(
-                        f"Skipping excluded dependency: {dep} (parent {parent_module} is excluded)"
-                    )
-                    break
-
-            if is_excluded:
+            parent_module = _matching_parent(
+                dep, self.excluded_modules, self._excluded_dotted
+            )
+            if parent_module is not None:
+                logger.info(
+                    "Skipping excluded dependency: %s (parent %s is excluded)",
+                    dep,
+                    parent_module,
+                )
                 continue
 
-            logger.info(f"Collecting files for dependency: {dep}")
+            collected_before = len(files_to_package)
             ext_path = self.site_packages / dep
-            if ext_path.exists():
-                if ext_path.is_dir():
-                    for file_path in ext_path.rglob("*"):
-                        if (
-                            file_path.is_file()
-                            and not file_path.name.startswith(".")
-                            and not file_path.name.endswith(".pyc")
-                        ):
-                            try:
-                                if (
-                                    file_path.suffix in [".so", ".dll", ".dylib"]
-                                    and file_path.stat().st_size > 50 * 1024 * 1024
-                                ):
-                                    continue
-                            except Exception:
-                                pass
-                            rel_path = file_path.relative_to(
-                                self.site_packages
-                            ).as_posix()
-                            files_to_package[rel_path] = file_path
+            if dep in self._sp_entries:
+                if self._sp_entries[dep]:
+                    for entry in self._package_files(str(ext_path), skip_dirs):
+                        name = entry.name
+                        if name[:1] == "." or name.endswith(SKIP_SUFFIXES):
+                            continue
+                        if prune and name.endswith(".pyi"):
+                            continue
+                        try:
+                            # stat() only binaries; DirEntry caches the result
+                            if (
+                                name.endswith(BINARY_SUFFIXES)
+                                and entry.stat().st_size > 50 * 1024 * 1024
+                            ):
+                                continue
+                        except Exception:
+                            pass
+                        rel_path = entry.path[sp_len:]
+                        if to_posix:
+                            rel_path = rel_path.replace(os.sep, "/")
+                        if rel_path not in seen:
+                            seen.add(rel_path)
+                            add((rel_path, entry.path))
                 else:
-                    py_file = self.site_packages / f"{dep}.py"
-                    if py_file.exists():
-                        files_to_package[f"{dep}.py"] = py_file
+                    if f"{dep}.py" in self._sp_entries:
+                        rel_path = f"{dep}.py"
                     elif ext_path.suffix == ".py":
                         rel_path = ext_path.relative_to(self.site_packages).as_posix()
-                        files_to_package[rel_path] = ext_path
+                    else:
+                        rel_path = None
+                    if rel_path is not None and rel_path not in seen:
+                        seen.add(rel_path)
+                        add((rel_path, str(self.site_packages / rel_path)))
 
             # Add matching *.dist-info / *.egg-info
-            for info_dir in self.site_packages.glob(f"{dep}*"):
-                if info_dir.is_dir() and (
-                    info_dir.name.endswith(".dist-info")
-                    or info_dir.name.endswith(".egg-info")
-                ):
+            for info_dir in self._info_dirs_with_prefix(dep):
+                if info_dir not in collected_info_dirs:
+                    collected_info_dirs.add(info_dir)
                     metadata_module = info_dir.name.split("-")[0].replace("_", "-")
                     if (
                         metadata_module in self.excluded_modules
                         or metadata_module.replace("-", "_") in self.excluded_modules
                     ):
                         continue
-                    for file_path in info_dir.rglob("*"):
-                        if file_path.is_file():
-                            rel_path = file_path.relative_to(
-                                self.site_packages
-                            ).as_posix()
-                            files_to_package[rel_path] = file_path
+                    for entry in _walk_files(str(info_dir)):
+                        if prune and entry.name == "RECORD":
+                            continue
+                        rel_path = entry.path[sp_len:]
+                        if to_posix:
+                            rel_path = rel_path.replace(os.sep, "/")
+                        if rel_path not in seen:
+                            seen.add(rel_path)
+                            add((rel_path, entry.path))
+
+            logger.info(
+                "Collected %d files for dependency: %s",
+                len(files_to_package) - collected_before,
+                dep,
+            )
 
         logger.info(f"Total files to package: {len(files_to_package)}")
         return files_to_package
@@ -679,8 +2161,27 @@ class ModulePackager:
         strategy: str = "auto",
         extra_modules: List[str] = None,
         env_file_provided: bool = False,
+        compresslevel: int = 1,
+        prune: bool = False,
+        compression: str = "deflate",
+        snowball: bool = False,
     ):
-        """Create a ZIP package containing the module and all (recursively) resolved dependencies."""
+        """Create a ZIP package containing the module and all (recursively) resolved dependencies.
+
+        Files are deflated at ``compresslevel`` in a thread pool and written in
+        order; at most a few files per worker are held in memory at once. With
+        ``compression="zstd"`` a multi-threaded zstd .tar.zst is written instead
+        (requires the zstandard package). With ``snowball=True`` the S3 sync
+        also uploads the collected files as one auto-extracting tar to a Snowball
+        Edge / MinIO endpoint (see sync_bundle_to_s3); the package itself is
+        always uploaded.
+        """
+        if compression == "zstd" and zstandard is None:
+            logger.error(
+                "zstd compression requires the zstandard package (pip install zstandard)"
+            )
+            return None
+
         output_dir = Path(output_dir) if output_dir else Path.cwd()
         output_dir.mkdir(exist_ok=True, parents=True)
 
@@ -699,16 +2200,17 @@ class ModulePackager:
             return None
 
         # Collect files for all resolved top-level modules
-        files_to_package = self.collect_modules_by_names(dep_modules)
+        files_to_package = self.collect_modules_by_names(dep_modules, prune=prune)
         if not files_to_package:
             logger.error(f"No files gathered for '{module_name}' after collection.")
             return None
 
-        zip_path = output_dir / f"{module_name}.zip"
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-            for archive_path, file_path in files_to_package.items():
-                zipf.write(file_path, archive_path)
-                logger.info(f"Added {archive_path} to package")
+        if compression == "zstd":
+            zip_path = output_dir / f"{module_name}.tar.zst"
+            self._write_tar_zst(zip_path, files_to_package)
+        else:
+            zip_path = output_dir / f"{module_name}.zip"
+            self._write_zip(zip_path, files_to_package, compresslevel)
 
         logger.info(f"Package created: {zip_path}")
         logger.info(
@@ -720,73 +2222,250 @@ class ModulePackager:
             sync_success = self.sync_to_s3(zip_path)
             if not sync_success:
                 logger.warning(f"Package created locally but failed to sync to S3")
+            if snowball and not self.sync_bundle_to_s3(files_to_package, module_name):
+                logger.warning("Auto-extract bundle was not uploaded")
 
         return zip_path
 
+    def _write_zip(
+        self,
+        zip_path: Path,
+        files_to_package: List[Tuple[str, str]],
+        compresslevel: int,
+    ) -> None:
+        """Write files into a ZIP, deflating in a thread pool and writing in order."""
+        if not ZIPFILE_INTERNALS:
+            self._write_zip_serial(zip_path, files_to_package, compresslevel)
+            return
+        # Reads block on I/O, so run a few more threads than compressing cores
+        # (same sizing as ThreadPoolExecutor's default)
+        workers = min(32, max(1, self.max_workers or 1) + 4)
+        window = workers * 4
+        with zipfile.ZipFile(
+            zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+        ) as zipf, ThreadPoolExecutor(max_workers=workers) as executor:
+            # Keep a window of files compressing ahead of the writer, bounded by
+            # count and by the bytes the workers hold (at least one file runs)
+            items = iter(files_to_package)
+            in_flight: deque = deque()
+            buffered = 0
+            nxt = next(items, None)
+            while True:
+                while nxt is not None and len(in_flight) < window:
+                    archive_path, file_path = nxt
+                    size = os.stat(file_path).st_size
+                    if _is_streamed(archive_path, size):
+                        size = 0
+                    if in_flight and buffered + size > WRITE_WINDOW_BYTES:
+                        break
+                    future = executor.submit(
+                        _deflate_file, file_path, archive_path, compresslevel
+                    )
+                    in_flight.append((file_path, size, future))
+                    buffered += size
+                    nxt = next(items, None)
+                if not in_flight:
+                    break
+                file_path, size, future = in_flight.popleft()
+                buffered -= size
+                zinfo, payload = future.result()
+                if payload is None:
+                    _stream_file(zipf, zinfo, file_path, compresslevel)
+                else:
+                    _write_deflated(zipf, zinfo, payload)
+                logger.debug("Added %s to package", zinfo.filename)
+
+    @staticmethod
+    def _write_zip_serial(
+        zip_path: Path, files_to_package: List[Tuple[str, str]], compresslevel: int
+    ) -> None:
+        """Write files into a ZIP one at a time through ZipFile.write()."""
+        with zipfile.ZipFile(
+            zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+        ) as zipf:
+            for archive_path, file_path in files_to_package:
+                if archive_path.lower().endswith(STORED_SUFFIXES):
+                    zipf.write(file_path, archive_path, zipfile.ZIP_STORED)
+                else:
+                    zipf.write(file_path, archive_path)
+                logger.debug("Added %s to package", archive_path)
+
+    @staticmethod
+    def _write_tar_zst(tar_path: Path, files_to_package: List[Tuple[str, str]]):
+        """Write files into a tar streamed through a multi-threaded zstd compressor."""
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+        with open(tar_path, "wb") as raw, compressor.stream_writer(
+            raw
+        ) as stream, tarfile.open(fileobj=stream, mode="w|") as tar:
+            for archive_path, file_path in files_to_package:
+                tar.add(file_path, arcname=archive_path, recursive=False)
+                logger.debug("Added %s to package", archive_path)
+
     # ------------------------------
     # TREE RENDERING (ASCII)
     # ------------------------------
     @staticmethod
-    def _render_tree(adjacency: Dict[str, Set[str]], roots: Iterable[str]) -> str:
-        """Render a clean ASCII tree with proper Unicode box-drawing characters."""
-        lines: List[str] = []
-        visited_in_path: Set[str] = set()  # Track current path to detect cycles
-        global_visited: Set[str] = set()  # Track all visited to avoid duplicates
-
-        def walk(node: str, prefix: str = "", is_last: bool = True, depth: int = 0):
-            # Detect circular dependencies
-            if node in visited_in_path:
-                connector = "└── " if is_last else "├── "
-                lines.append(f"{prefix}{connector}{node} ↻ (circular)\n")
-                return
+    def _collapse_cycles(
+        adjacency: Dict[str, Set[str]],
+    ) -> Tuple[Dict[str, Set[str]], Dict[str, str]]:
+        """Condense every dependency cycle into a single "{a, b} (cycle)" node.
 
-            # Add current node to path
-            visited_in_path.add(node)
+        Iterative Tarjan SCC, so deep graphs cannot hit the recursion limit.
+        Returns the acyclic adjacency and each original node's new label.
+        """
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        scc_stack: List[str] = []
+        label: Dict[str, str] = {}
+
+        for start in adjacency:
+            if start in index:
+                continue
+            index[start] = low[start] = len(index)
+            scc_stack.append(start)
+            on_stack.add(start)
+            # Frames are (node, iterator over its remaining children)
+            work = [(start, iter(adjacency[start]))]
+            while work:
+                node, kids = work[-1]
+                for kid in kids:
+                    if kid not in index:
+                        index[kid] = low[kid] = len(index)
+                        scc_stack.append(kid)
+                        on_stack.add(kid)
+                        work.append((kid, iter(adjacency.get(kid, ()))))
+                        break
+                    if kid in on_stack:
+                        low[node] = min(low[node], index[kid])
+                else:
+                    # All children done: propagate low-link, then close the SCC
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        members = []
+                        while True:
+                            member = scc_stack.pop()
+                            on_stack.discard(member)
+                            members.append(member)
+                            if member == node:
+                                break
+                        if len(members) > 1 or node in adjacency.get(node, ()):
+                            name = "{" + ", ".join(sorted(members)) + "} (cycle)"
+                        else:
+                            name = node
+                        for member in members:
+                            label[member] = name
 
-            # Choose the right connector and display the node
-            if depth == 0:
-                # Root node
-                lines.append(f"{node}\n")
-            else:
-                connector = "└── " if is_last else "├── "
-                # Mark if we've seen this node before (but not in current path)
-                marker = " (already shown)" if node in global_visited else ""
-                lines.append(f"{prefix}{connector}{node}{marker}\n")
-
-            # Get children and sort them
-            children = sorted(adjacency.get(node, set()))
-
-            # Only show children if we haven't fully processed this node before
-            show_children = node not in global_visited
-            if show_children:
-                # Mark as globally visited before processing children
-                global_visited.add(node)
+        dag: Dict[str, Set[str]] = {}
+        for parent, kids in adjacency.items():
+            name = label[parent]
+            targets = dag.setdefault(name, set())
+            targets.update(label[kid] for kid in kids if label[kid] != name)
+        return dag, label
 
-                for i, child in enumerate(children):
-                    is_last_child = i == len(children) - 1
+    @staticmethod
+    def _render_tree(
+        adjacency: Dict[str, Set[str]],
+        roots: Iterable[str],
+        expand_shared: bool = False,
+    ) -> str:
+        """Render a clean ASCII tree with proper Unicode box-drawing characters.
+
+        A node reached again is normally printed once more as "(already shown)".
+        With expand_shared, its full subtree is repeated under every parent; a
+        subtree rendered without any circular marker does not depend on the path
+        leading to it, so its lines are cached and re-indented on later visits.
+
+        Rendered output is memoised per process by graph contents and roots.
+        """
+        graph = frozenset((node, frozenset(kids)) for node, kids in adjacency.items())
+        return _render_graph(graph, tuple(sorted(set(roots))), expand_shared)
 
-                    # Build the prefix for the child
-                    if depth == 0:
-                        child_prefix = ""
-                    else:
-                        child_prefix = prefix + ("    " if is_last else "│   ")
+    @staticmethod
+    def render_inspect_report(
+        module_name: str,
+        mods: Set[str],
+        dists: Set[str],
+        tree: Dict[str, Set[str]],
+        kind: Optional[str],
+        extra_modules: Optional[List[str]] = None,
+        expand_shared: bool = False,
+        collapse_cycles: bool = False,
+    ) -> str:
+        """Build the --inspect report (summary, dependency lists and ASCII tree)."""
+        lines: List[str] = []
+        add = lines.append
+        add("=" * 60)
+        add(f"DEPENDENCY ANALYSIS FOR: {module_name}")
+        add("=" * 60)
+        add(f"Strategy Used: {kind or 'none'}")
+        add(f"Total Distributions: {len(dists)}")
+        add(f"Total Top-level Modules: {len(mods)}")
+        if extra_modules:
+            add(
+                f"Extra Modules Included: {len(extra_modules)} ({', '.join(extra_modules)})"
+            )
+        add("")
 
-                    walk(child, child_prefix, is_last_child, depth + 1)
+        if dists:
+            add("📦 DISTRIBUTIONS:")
+            for d in sorted(dists):
+                add(f"  • {d}")
+            add("")
 
-            # Remove from current path when backtracking
-            visited_in_path.discard(node)
+        if mods:
+            add("🐍 TOP-LEVEL MODULES:")
+            for m in sorted(mods):
+                add(f"  • {m}")
+            add("")
 
-        # Process each root
-        roots_list = sorted(set(roots))
-        for i, root in enumerate(roots_list):
-            visited_in_path.clear()
-            walk(root, "", True, 0)
+        # Tree view
+        add("🌳 DEPENDENCY TREE:")
+        labels: Dict[str, str] = {}
+        if collapse_cycles and tree:
+            tree, labels = ModulePackager._collapse_cycles(tree)
+        if kind == "metadata":
+            # Build incoming count to find roots in the dist graph
+            incoming = Counter(chain.from_iterable(tree.values()))
+            # Prefer the provided name as a root; also include any with no incoming edges
+            roots = [labels.get(module_name, module_name)]
+            roots.extend(
+                [n for n in tree.keys() if n not in incoming and n not in roots]
+            )
+            ascii_tree = ModulePackager._render_tree(
+                tree, roots, expand_shared=expand_shared
+            )
+            add(ascii_tree)
+        elif kind == "imports":
+            # For imports strategy, find actual roots (modules with no incoming dependencies)
+            incoming = Counter(chain.from_iterable(tree.values()))
 
-            # Add spacing between different root trees
-            if i < len(roots_list) - 1:
-                lines.append("\n")
+            # Find all modules that are not imported by others (potential roots);
+            # every child is already a key of incoming
+            all_modules = incoming.keys() | tree.keys()
+            actual_roots = [m for m in all_modules if m not in incoming]
 
-        return "".join(lines)
+            # If no clear roots found or if the target module exists, include it
+            target_root = module_name.split(".")[0]
+            target_root = labels.get(target_root, target_root)
+            if not actual_roots or target_root in all_modules:
+                if target_root not in actual_roots:
+                    actual_roots = [target_root] + actual_roots
+
+            if actual_roots and tree:
+                ascii_tree = ModulePackager._render_tree(
+                    tree, actual_roots, expand_shared=expand_shared
+                )
+                add(ascii_tree)
+            else:
+                add(f"No import dependencies found for '{module_name}'")
+        else:
+            add("(no tree available)")
+
+        return "\n".join(lines)
 
 
 # ------------------------------
@@ -831,6 +2510,21 @@ def main():
         action="store_true",
         help="Only inspect the resolved dependency sets and print an ASCII tree (no zip)",
     )
+    parser.add_argument(
+        "--expand-shared",
+        action="store_true",
+        help="With --inspect, repeat a shared dependency's subtree under every parent instead of marking it '(already shown)'",
+    )
+    parser.add_argument(
+        "--collapse-cycles",
+        action="store_true",
+        help="With --inspect, draw each dependency cycle as one '{a, b} (cycle)' node",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="With --inspect, print the resolved sets and graph as JSON instead of the report",
+    )
     parser.add_argument(
         "--slow-print",
         type=float,
@@ -843,8 +2537,49 @@ def main():
         default=".env",
         help="Path to environment file containing AWS settings (default: .env)",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk cache of parsed imports (~/.cache/module_packager)",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=1,
+        choices=range(0, 10),
+        metavar="0-9",
+        help="Deflate level for the ZIP package (default: 1, fastest; 9 is smallest)",
+    )
+    parser.add_argument(
+        "--snowball",
+        action="store_true",
+        help="Also upload the packaged files as one tar that auto-extracts under <module>/; Snowball Edge / MinIO only, needs s3_endpoint_url in the environment file (requires boto3)",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=["deflate", "zstd"],
+        default="deflate",
+        help="Package format: 'deflate' writes a .zip (default, what Lambda expects); 'zstd' writes a multi-threaded .tar.zst (requires zstandard)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Leave tests/test directories, .pyi stubs and dist-info RECORD files out of the ZIP",
+    )
+    parser.add_argument(
+        "--deep-scan",
+        action="store_true",
+        help="Also follow imports inside functions and class bodies (lazy imports, missed by default) and in tests, test, vendor, _vendor and examples directories (imports strategy)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for parsing package sources; also sizes the ZIP compression thread pool (default: CPU count, 1 disables parallel parsing)",
+    )
 
     args = parser.parse_args()
+    module_name = args.module
 
     # Parse include-extras as a list of modules
     include_extras_list = []
@@ -856,101 +2591,72 @@ def main():
         ]
 
     # Set up print function based on slow-print option
-    if args.slow_print > 0:
+    delay = args.slow_print
+    if delay > 0:
 
         def print_func(text: str):
-            slow_print(text, args.slow_print)
+            slow_print(text, delay)
 
     else:
         print_func = print
 
     packager = ModulePackager(
-        getattr(args, "venv_path", None), args.config, getattr(args, "env_file", ".env")
+        getattr(args, "venv_path", None),
+        args.config,
+        getattr(args, "env_file", ".env"),
+        max_workers=args.workers,
+        use_cache=not args.no_cache,
+        deep_scan=args.deep_scan,
     )
 
     if args.inspect:
         mods, dists, tree, kind = packager.inspect_dependencies(
-            args.module,
+            module_name,
             strategy=args.strategy,
             include_extras=False,
             extra_modules=include_extras_list,
         )
-        print_func("=" * 60)
-        print_func(f"DEPENDENCY ANALYSIS FOR: {args.module}")
-        print_func("=" * 60)
-        print_func(f"Strategy Used: {kind or 'none'}")
-        print_func(f"Total Distributions: {len(dists)}")
-        print_func(f"Total Top-level Modules: {len(mods)}")
-        if include_extras_list:
+        if args.json:
+            tree_json = {parent: sorted(kids) for parent, kids in sorted(tree.items())}
             print_func(
-                f"Extra Modules Included: {len(include_extras_list)} ({', '.join(include_extras_list)})"
-            )
-        print_func("")
-
-        if dists:
-            print_func("📦 DISTRIBUTIONS:")
-            for d in sorted(dists):
-                print_func(f"  • {d}")
-            print_func("")
-
-        if mods:
-            print_func("🐍 TOP-LEVEL MODULES:")
-            for m in sorted(mods):
-                print_func(f"  • {m}")
-            print_func("")
-
-        # Tree view
-        print_func("🌳 DEPENDENCY TREE:")
-        if kind == "metadata":
-            # Build incoming count to find roots in the dist graph
-            incoming: Dict[str, int] = defaultdict(int)
-            for parent, kids in tree.items():
-                for k in kids:
-                    incoming[k] += 1
-            # Prefer the provided name as a root; also include any with no incoming edges
-            roots = [args.module]
-            roots.extend(
-                [n for n in tree.keys() if incoming.get(n, 0) == 0 and n not in roots]
-            )
-            ascii_tree = ModulePackager._render_tree(tree, roots)
-            print_func(ascii_tree)
-        elif kind == "imports":
-            # For imports strategy, find actual roots (modules with no incoming dependencies)
-            incoming: Dict[str, int] = defaultdict(int)
-            for parent, children in tree.items():
-                for child in children:
-                    incoming[child] += 1
-
-            # Find all modules that are not imported by others (potential roots)
-            all_modules = (
-                set(tree.keys()) | set().union(*tree.values()) if tree else set()
+                json.dumps(
+                    {
+                        "dists": sorted(dists),
+                        "mods": sorted(mods),
+                        "tree": tree_json,
+                        "kind": kind,
+                    },
+                    indent=2,
+                )
             )
-            actual_roots = [m for m in all_modules if incoming.get(m, 0) == 0]
-
-            # If no clear roots found or if the target module exists, include it
-            target_root = args.module.split(".")[0]
-            if not actual_roots or target_root in all_modules:
-                if target_root not in actual_roots:
-                    actual_roots = [target_root] + actual_roots
-
-            if actual_roots and tree:
-                ascii_tree = ModulePackager._render_tree(tree, actual_roots)
-                print_func(ascii_tree)
-            else:
-                print_func(f"No import dependencies found for '{args.module}'")
         else:
-            print_func("(no tree available)")
+            print_func(
+                ModulePackager.render_inspect_report(
+                    module_name,
+                    mods,
+                    dists,
+                    tree,
+                    kind,
+                    include_extras_list,
+                    expand_shared=args.expand_shared,
+                    collapse_cycles=args.collapse_cycles,
+                )
+            )
         return
 
     # Otherwise, produce zip
     env_file_provided = hasattr(args, "env_file")  # and args.env_file != ".env"
     zip_path = packager.create_package(
-        args.module,
+        module_name,
         Path(args.output_dir),
         include_extras=False,
         strategy=args.strategy,
         extra_modules=include_extras_list,
         env_file_provided=env_file_provided,
+        compresslevel=args.compress_level,
+        prune=args.prune,
+        compression=args.compression,
+        snowball=args.snowball,
     )
 
     if zip_path: